@@ -1,21 +1,234 @@
 import asyncio
+import io
+import os
+import string
 import time
+
+# CTranslate2 reads its OpenMP settings at load time, so pin them before faster_whisper is imported
+CPU_THREADS = max(1, (os.cpu_count() or 2) // 2)  # roughly the physical core count
+os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
+os.environ.setdefault("OMP_PROC_BIND", "close")
+os.environ.setdefault("OMP_PLACES", "cores")
+
+import ctranslate2
+import numba
 import numpy as np
-import resampy
+import scipy.signal
 import textwrap
 from frame_msg import FrameMsg, RxAudio, TxCode
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments
 
 # ------------ Config ---------------------------------------------------
 MODEL_SIZE  = "base"     # tiny / base / small …
+BATCH_SIZE  = 8          # VAD segments decoded together
 STEP_SEC    = 1.0        # seconds between partial decodes
 RATE_IN     = 8000       # Frame mic
 RATE_OUT    = 16000      # Whisper expects
 CONTEXT_SEC = 25         # rolling window on which we run Whisper
+TRIM_SEC    = 20         # cap on audio kept while nothing gets confirmed
+LINE_CHARS  = 40         # characters per line on Frame's display
+DISPLAY_LINES = 6        # transcript lines Frame shows
+SILENCE_RMS = 1e-3       # ticks quieter than this are not decoded once the utterance is settled
+AUDIO_QUEUE_MAX = 200    # packets buffered before the oldest are dropped
+PROMPT_CHARS = 200       # confirmed text passed back to Whisper as context
+SHORT_CLIP_OFFSET = 240  # 1.5 mel frames; tags the shorter hypothesis' segments
 # -----------------------------------------------------------------------
 
-def pcm16_to_f32(pcm: bytes) -> np.ndarray:
-    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+# Low-pass FIR for the fixed 2x upsample (gain of 2 restores the zero-stuffed level)
+UP_TAPS = (scipy.signal.firwin(64, 0.5, window=("kaiser", 8.0)) * 2).astype(np.float32)
+# Same taps with the PCM16 → [-1, 1) scale folded in, so the kernel never scales samples itself
+PCM_TAPS = UP_TAPS * np.float32(1.0 / 32768.0)
+TAPS_PER_PHASE = UP_TAPS.size // 2
+HIST_LEN = TAPS_PER_PHASE - 1  # input samples each polyphase output reaches back
+# Per-phase taps, reversed so the dot products walk the input forwards. Numba freezes these
+# globals into the compiled kernel, so the tap count is a constant it can unroll and vectorize.
+EVEN_TAPS = np.ascontiguousarray(PCM_TAPS[0::2][::-1])
+ODD_TAPS = np.ascontiguousarray(PCM_TAPS[1::2][::-1])
+
+@numba.njit(cache=True, fastmath=True, boundscheck=False)
+def decode_resample_into(pcm_i16, hist, out, out_pos):
+    """
+    Decode PCM16 and polyphase-upsample 2x into out[out_pos:] in one pass, with the filter and
+    PCM16 scale baked in. hist carries the previous call's newest raw samples so ticks join cleanly.
+    Returns the new write position.
+    """
+    n = pcm_i16.size
+    m = HIST_LEN
+    
+    # Outputs whose taps reach into the previous call run over history + the head of this chunk
+    head = min(n, m)
+    edge = np.empty(m + head, dtype=np.float32)
+    edge[:m] = hist
+    for k in range(head):
+        edge[m + k] = pcm_i16[k]
+    for i in range(head):
+        even = np.float32(0.0)
+        odd = np.float32(0.0)
+        for k in range(TAPS_PER_PHASE):
+            x = edge[i + k]
+            even += EVEN_TAPS[k] * x
+            odd += ODD_TAPS[k] * x
+        out[out_pos] = even
+        out[out_pos + 1] = odd
+        out_pos += 2
+    
+    # Steady state: every tap reads this chunk directly, with no branch in the inner loop
+    for i in range(m, n):
+        even = np.float32(0.0)
+        odd = np.float32(0.0)
+        for k in range(TAPS_PER_PHASE):
+            x = np.float32(pcm_i16[i - m + k])
+            even += EVEN_TAPS[k] * x
+            odd += ODD_TAPS[k] * x
+        out[out_pos] = even
+        out[out_pos + 1] = odd
+        out_pos += 2
+    
+    # Keep the newest input samples for the next call
+    if n >= m:
+        for k in range(m):
+            hist[k] = pcm_i16[n - m + k]
+    else:
+        for k in range(m - n):
+            hist[k] = hist[k + n]
+        for k in range(n):
+            hist[m - n + k] = pcm_i16[k]
+    return out_pos
+
+def pcm16_rms(pcm_i16: np.ndarray) -> float:
+    """RMS level of PCM16 samples on the [-1, 1) scale"""
+    x = pcm_i16.astype(np.float32)
+    return float(np.sqrt(np.dot(x, x) / x.size)) / 32768.0
+
+def pick_device():
+    """Device and compute type for Whisper: fp16 on a CUDA GPU, int8 on CPU"""
+    if ctranslate2.get_cuda_device_count() > 0:
+        return "cuda", "float16"
+    return "cpu", "int8"
+
+def ring_snapshot(ring: np.ndarray, w: int, filled: int, out: np.ndarray) -> np.ndarray:
+    """Copy the ring's samples, oldest first, into out and return the contiguous out[:filled] view"""
+    start = w - filled
+    if start >= 0:
+        np.copyto(out[:filled], ring[start:w])
+    else:
+        np.copyto(out[:-start], ring[start:])
+        np.copyto(out[-start:filled], ring[:w])
+    return out[:filled]
+
+def collect_words(segments, t0: float) -> list:
+    """Flatten segment words into (start, end, text) tuples on the recording timeline"""
+    return [(t0 + w.start, t0 + w.end, w.word) for s in segments for w in (s.words or [])]
+
+def run_transcribe(pipe, audio: np.ndarray, t0: float, prompt: str = "", final: bool = False) -> list:
+    """
+    Blocking decode, meant for a worker thread; returns words on the recording timeline.
+    Partials are greedy since the next tick overwrites them; only the final pass uses beam search.
+    The batched pipeline decodes each VAD chunk independently at a single temperature, so neither pass
+    conditions on previous text or falls back to higher temperatures.
+    prompt is the tail of the confirmed text, which keeps context across the trimmed buffer at a bounded length.
+    """
+    segments, _ = pipe.transcribe(
+        audio,
+        batch_size=BATCH_SIZE,
+        language="en",
+        beam_size=5 if final else 1,
+        initial_prompt=prompt[-PROMPT_CHARS:] or None,
+        vad_filter=True,
+        word_timestamps=True,
+    )
+    return collect_words(segments, t0)
+
+def decode_hypotheses(pipe, audio: np.ndarray, t0: float, prompt: str):
+    """
+    Decode the buffer with and without its newest STEP_SEC in one batch, so both hypotheses share a
+    single pipeline call and LocalAgreement can confirm words within a tick. VAD runs once; both clip
+    lists come from its speech regions, the shorter one cut at the step boundary.
+    Blocking, meant for a worker thread. Returns (shorter_words, full_words); shorter_words is None
+    while the buffer holds less than two steps of audio.
+    """
+    step = int(STEP_SEC * RATE_OUT)
+    if audio.size < 2 * step:
+        return None, run_transcribe(pipe, audio, t0, prompt)
+    # Same VAD settings the pipeline applies itself when vad_filter=True
+    vad_options = VadOptions(
+        max_speech_duration_s=pipe.model.feature_extractor.chunk_length, min_silence_duration_ms=160
+    )
+    full_clips = [
+        {"start": r["start"], "end": r["end"]}
+        for r in merge_segments(get_speech_timestamps(audio, vad_options), vad_options)
+    ]
+    if not full_clips:
+        return [], []
+    cut = audio.size - step
+    short_clips = [
+        {"start": c["start"] + SHORT_CLIP_OFFSET, "end": min(c["end"], cut)}
+        for c in full_clips
+        if min(c["end"], cut) > c["start"] + SHORT_CLIP_OFFSET
+    ]
+    # The pipeline stamps each segment with its clip's start frame as seek; shifting the shorter clips
+    # past the next frame keeps the two sets apart, so seek says which hypothesis a segment belongs to
+    full_seeks = {int(c["start"] / RATE_OUT * 100) for c in full_clips}
+    short_seeks = {int(c["start"] / RATE_OUT * 100) for c in short_clips}
+    assert not full_seeks & short_seeks
+    # Full clips go first so their word timings match a standalone decode
+    segments, _ = pipe.transcribe(
+        audio,
+        batch_size=BATCH_SIZE,
+        clip_timestamps=full_clips + short_clips,
+        language="en",
+        beam_size=1,
+        initial_prompt=prompt[-PROMPT_CHARS:] or None,
+        word_timestamps=True,
+    )
+    full, shorter = [], []
+    for segment in segments:
+        assert segment.seek in full_seeks or segment.seek in short_seeks, "segment seek no longer tags its clip"
+        (shorter if segment.seek in short_seeks else full).append(segment)
+    return collect_words(shorter, t0), collect_words(full, t0)
+
+def display_tail(text: str) -> str:
+    """The newest DISPLAY_LINES of text, word-wrapped to Frame's line width and joined by newlines"""
+    return "\n".join(textwrap.wrap(text, LINE_CHARS)[-DISPLAY_LINES:])
+
+async def send_text(frame, lines: str, shown: str, seq: int):
+    """
+    Put lines on Frame's display; returns the new (shown, seq).
+    When lines only extend what is shown, just the new characters go out as a TEXT_APPEND (0x32), otherwise
+    a TEXT_UPDATE (0x31) replaces the display. Each message starts with a one-byte sequence number, and
+    Frame drops an append that does not directly follow the last message it applied and asks for a resync.
+    """
+    seq = (seq + 1) % 256
+    if shown and lines.startswith(shown):
+        await frame.send_message(0x32, bytes([seq]) + lines[len(shown):].encode())
+    else:
+        await frame.send_message(0x31, bytes([seq]) + lines.encode())
+    return lines, seq
+
+def warm_up(model, pipe):
+    """Pay one-off startup costs (JIT compile, VAD load, CT2 thread pool, mel filters) before the first utterance"""
+    decode_resample_into(
+        np.zeros(RATE_IN, dtype=np.int16), np.zeros(HIST_LEN, dtype=np.float32),
+        np.empty(2 * RATE_IN, dtype=np.float32), 0,
+    )
+    silence = np.zeros(RATE_OUT, dtype=np.float32)
+    run_transcribe(pipe, silence, 0.0)
+    # VAD drops pure silence before it reaches the model, so run the encoder/decoder directly once too
+    segments, _ = model.transcribe(silence, language="en", beam_size=1, vad_filter=False)
+    list(segments)
+
+def normalize_word(word: str) -> str:
+    return word.strip().strip(string.punctuation).lower()
+
+def agreed_prefix(prev_words: list, cur_words: list) -> list:
+    """LocalAgreement-2: the leading words that two consecutive hypotheses agree on"""
+    n = 0
+    for prev, cur in zip(prev_words, cur_words):
+        if normalize_word(prev[2]) != normalize_word(cur[2]):
+            break
+        n += 1
+    return cur_words[:n]
 
 async def main():
     """
@@ -23,19 +236,37 @@ async def main():
     """
     frame = FrameMsg()
     rx_audio = None
+    pump_task = None
     
     try:
         # Load Whisper model
         print("Loading faster-whisper model...")
-        model = WhisperModel(MODEL_SIZE, device="cpu", compute_type="int8")
+        device, compute_type = pick_device()
+        print(f"Using {device} ({compute_type})")
+        model = WhisperModel(
+            MODEL_SIZE,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=CPU_THREADS,
+        )
+        # Split each buffer on VAD boundaries and push the chunks through the model as one batch
+        pipe = BatchedInferencePipeline(model=model)
+        warm_up(model, pipe)
         print("Whisper model loaded")
         
         print("Connecting to Frame...")
         await frame.connect()
         print("Connected successfully!")
         
-        # Attach print response handler to see Frame's Lua print statements
-        frame.attach_print_response_handler()
+        # Attach print response handler to see Frame's Lua print statements; TEXT_RESYNC means an
+        # append was dropped and the display needs the full text again
+        resync = asyncio.Event()
+        def on_print(msg: str):
+            if msg == "TEXT_RESYNC":
+                resync.set()
+            else:
+                print(msg)
+        frame.attach_print_response_handler(on_print)
         
         # Create a custom Lua app that handles display and audio
         custom_lua_app = """
@@ -46,13 +277,21 @@ async def main():
         -- Message codes
         local AUDIO_CONTROL_MSG = 0x30
         local TEXT_UPDATE_MSG = 0x31
+        local TEXT_APPEND_MSG = 0x32
+        
+        -- Lines on the display (wrapped by the host), the sequence number of the last text message
+        -- applied, and whether a resync has been asked for since
+        local transcript = ""
+        local text_seq = -1
+        local resync_requested = false
         
         -- Register message parsers
         data.parsers[AUDIO_CONTROL_MSG] = code.parse_code
-        data.parsers[TEXT_UPDATE_MSG] = function(bytes)
-            local str = string.sub(bytes, 1)
-            return {text = str}
+        local function parse_text(bytes)
+            return {seq = string.byte(bytes, 1), text = string.sub(bytes, 2)}
         end
+        data.parsers[TEXT_UPDATE_MSG] = parse_text
+        data.parsers[TEXT_APPEND_MSG] = parse_text
         
         -- Main app function
         function app_loop()
@@ -90,8 +329,31 @@ async def main():
                                 data.app_data[AUDIO_CONTROL_MSG] = nil
                             end
                             
-                            -- Handle text update messages
-                            if data.app_data[TEXT_UPDATE_MSG] ~= nil and data.app_data[TEXT_UPDATE_MSG].text ~= nil then
+                            -- Handle text messages; a replacement goes first since an append may build on it
+                            local text_changed = false
+                            local update = data.app_data[TEXT_UPDATE_MSG]
+                            if update ~= nil then
+                                transcript = update.text
+                                text_seq = update.seq
+                                resync_requested = false
+                                text_changed = true
+                                data.app_data[TEXT_UPDATE_MSG] = nil
+                            end
+                            local append = data.app_data[TEXT_APPEND_MSG]
+                            if append ~= nil then
+                                if append.seq == (text_seq + 1) % 256 then
+                                    transcript = transcript .. append.text
+                                    text_seq = append.seq
+                                    text_changed = true
+                                elseif not resync_requested then
+                                    -- An earlier append was lost or overtaken; ask the host for the full text
+                                    print("TEXT_RESYNC")
+                                    resync_requested = true
+                                end
+                                data.app_data[TEXT_APPEND_MSG] = nil
+                            end
+                            
+                            if text_changed then
                                 -- Clear display
                                 frame.display.text("                                        ", 10, 10)
                                 frame.display.text("                                        ", 10, 50)
@@ -101,27 +363,15 @@ async def main():
                                 frame.display.text("                                        ", 10, 210)
                                 frame.display.text("                                        ", 10, 250)
                                 
-                                -- Display new text
-                                local text = data.app_data[TEXT_UPDATE_MSG].text
+                                -- Display new text, one wrapped line per row
                                 frame.display.text("Transcription:", 10, 10)
-                                
-                                -- Split text into lines (simple approach)
                                 local y = 50
-                                local start = 1
-                                local line_length = 40
-                                
-                                while start <= #text do
-                                    local display_text = string.sub(text, start, start + line_length - 1)
-                                    frame.display.text(display_text, 10, y)
+                                for line in string.gmatch(transcript, "[^\\n]+") do
+                                    frame.display.text(line, 10, y)
                                     y = y + 40
-                                    start = start + line_length
-                                    
-                                    -- Prevent too many lines
-                                    if y > 250 then break end
                                 end
                                 
                                 frame.display.show()
-                                data.app_data[TEXT_UPDATE_MSG] = nil
                             end
                         end
                         
@@ -167,12 +417,28 @@ async def main():
         
         # Set up audio receiver
         rx_audio = RxAudio(streaming=True)
-        audio_queue = await rx_audio.attach(frame)
+        # Feed a bounded queue so a stalled consumer drops stale audio instead of lagging further behind
+        audio_queue = asyncio.Queue(maxsize=AUDIO_QUEUE_MAX)
+        pump_task = asyncio.create_task(pump_audio(await rx_audio.attach(frame), audio_queue))
         
         # Initialize audio buffers
-        buf_pcm8k = bytearray()
-        buf_pcm16k = np.empty(0, dtype=np.float32)
+        max_samples = CONTEXT_SEC * RATE_OUT
+        buf_pcm8k = io.BytesIO()
+        ring = np.empty(max_samples, dtype=np.float32)
+        ring_w = 0
+        ring_filled = 0
+        up_stage = np.empty(max_samples, dtype=np.float32)  # only used when a chunk wraps
+        # Double-buffered snapshots: the worker reads one while the next tick fills the other
+        snaps = (np.empty(max_samples, dtype=np.float32), np.empty(max_samples, dtype=np.float32))
+        snap_idx = 0
+        hist = np.zeros(HIST_LEN, dtype=np.float32)
+        samples_in = 0           # 16 kHz samples written since recording started
+        confirmed_text = ""
+        confirmed_t = 0.0        # end of the last confirmed word, in seconds
+        prev_words = []          # unconfirmed words from the previous decode
         last_terminal = ""
+        shown = ""               # lines currently on Frame's display
+        text_seq = 0             # sequence number of the last text message sent to Frame
         
         # Main loop
         while True:
@@ -180,8 +446,15 @@ async def main():
             await asyncio.to_thread(input, "Press Enter to start recording: ")
             
             # Clear buffers
-            buf_pcm8k.clear()
-            buf_pcm16k = np.empty(0, dtype=np.float32)
+            buf_pcm8k.seek(0)
+            buf_pcm8k.truncate()
+            ring_w = 0
+            ring_filled = 0
+            hist[:] = 0.0
+            samples_in = 0
+            confirmed_text = ""
+            confirmed_t = 0.0
+            prev_words = []
             last_terminal = ""
             
             # Start audio recording
@@ -189,7 +462,8 @@ async def main():
             await frame.send_message(0x30, TxCode(value=1).pack())
             
             # Send initial message to Frame
-            await frame.send_message(0x31, "Listening...".encode())
+            resync.clear()
+            shown, text_seq = await send_text(frame, "Listening...", "", text_seq)
             
             # Record and process audio
             print("Recording... (Press Enter to stop)")
@@ -199,49 +473,120 @@ async def main():
             stop_task = asyncio.create_task(wait_for_stop(stop_event))
             
             last_t = time.time()
-            max_samples = CONTEXT_SEC * RATE_OUT
+            transcribe_task = None   # decode running in a worker thread, if any
             
             try:
                 while not stop_event.is_set():
                     try:
+                        # Apply a finished decode without blocking audio ingest
+                        if transcribe_task is not None and transcribe_task.done():
+                            shorter, words = transcribe_task.result()
+                            transcribe_task = None
+                            
+                            # Confirm the words both hypotheses agree on: the shorter buffer's decode
+                            # when there was one, otherwise the previous tick's
+                            cur_words = [w for w in words if w[0] >= confirmed_t - 0.1]
+                            if shorter is not None:
+                                reference = [w for w in shorter if w[0] >= confirmed_t - 0.1]
+                            else:
+                                reference = prev_words
+                            committed = agreed_prefix(reference, cur_words)
+                            prev_words = cur_words[len(committed):]
+                            if committed:
+                                confirmed_text += "".join(w[2] for w in committed)
+                                confirmed_t = committed[-1][1]
+                            
+                            # Drop confirmed audio so the next decode starts where agreement ended
+                            buffer_t0 = (samples_in - ring_filled) / RATE_OUT
+                            drop = int((confirmed_t - buffer_t0) * RATE_OUT)
+                            ring_filled -= min(max(drop, 0), ring_filled)
+                            
+                            # Without agreement (e.g. long silence) don't let the buffer grow past TRIM_SEC;
+                            # words falling off the front are confirmed as they stand
+                            excess = ring_filled - TRIM_SEC * RATE_OUT
+                            if excess > 0:
+                                ring_filled -= excess
+                                buffer_t0 = (samples_in - ring_filled) / RATE_OUT
+                                forced = 0
+                                while forced < len(prev_words) and prev_words[forced][1] <= buffer_t0:
+                                    forced += 1
+                                confirmed_text += "".join(w[2] for w in prev_words[:forced])
+                                prev_words = prev_words[forced:]
+                                confirmed_t = max(confirmed_t, buffer_t0)
+                            
+                            # Collect transcription
+                            text = (confirmed_text + "".join(w[2] for w in prev_words)).strip()
+                            if text and text != last_terminal:
+                                # Print to terminal
+                                print(f"Transcription: {text}")
+                                last_terminal = text
+                                
+                                # Send to Frame: only the lines it can show, as an append while they just grow
+                                lines = display_tail(text)
+                                if lines != shown:
+                                    shown, text_seq = await send_text(frame, lines, shown, text_seq)
+                        
+                        # Frame dropped an append; replace its display with what it should show
+                        if resync.is_set():
+                            resync.clear()
+                            shown, text_seq = await send_text(frame, shown, "", text_seq)
+                        
                         # Get audio packet with timeout
                         pkt = await asyncio.wait_for(audio_queue.get(), timeout=0.1)
+                        # Drain whatever else is already queued without another trip through the event loop
+                        while pkt is not None:
+                            buf_pcm8k.write(pkt)
+                            try:
+                                pkt = audio_queue.get_nowait()
+                            except asyncio.QueueEmpty:
+                                break
                         if pkt is None:  # Stream ended
                             break
-                        buf_pcm8k += pkt
                         
                         # Process audio at regular intervals
                         if time.time() - last_t >= STEP_SEC:
                             last_t = time.time()
-                            pcm_f32 = pcm16_to_f32(bytes(buf_pcm8k))
-                            buf_pcm8k.clear()
-                            if pcm_f32.size == 0:
+                            if buf_pcm8k.tell() == 0:
                                 continue
                             
-                            # Resample 8 kHz → 16 kHz
-                            up = resampy.resample(pcm_f32, RATE_IN, RATE_OUT)
-                            buf_pcm16k = np.concatenate([buf_pcm16k, up])
-                            if buf_pcm16k.size > max_samples:
-                                buf_pcm16k = buf_pcm16k[-max_samples:]
+                            # Read the buffer in place (never more than one context window of new audio)
+                            pcm_view = buf_pcm8k.getbuffer()
+                            pcm_i16 = np.frombuffer(pcm_view, dtype=np.int16)[-(max_samples // 2):]
                             
-                            # Transcribe audio
-                            segments, _ = model.transcribe(
-                                buf_pcm16k,
-                                language="en",
-                                beam_size=5,
-                                vad_filter=True,
-                                word_timestamps=False,
-                            )
+                            silent = pcm16_rms(pcm_i16[-int(STEP_SEC * RATE_IN):]) < SILENCE_RMS
                             
-                            # Collect transcription
-                            text = "".join(s.text for s in segments).strip()
-                            if text and text != last_terminal:
-                                # Print to terminal
-                                print(f"Transcription: {text}")
-                                last_terminal = text
-                                
-                                # Send to Frame
-                                await frame.send_message(0x31, text.encode())
+                            # Decode + resample 8 kHz → 16 kHz into the ring buffer
+                            n = 2 * pcm_i16.size
+                            if ring_w + n <= max_samples:
+                                ring_w = decode_resample_into(pcm_i16, hist, ring, ring_w) % max_samples
+                            else:
+                                decode_resample_into(pcm_i16, hist, up_stage, 0)
+                                first = max_samples - ring_w
+                                ring[ring_w:] = up_stage[:first]
+                                ring[:n - first] = up_stage[first:n]
+                                ring_w = n - first
+                            # BytesIO can't be resized while a view of it is alive
+                            del pcm_i16
+                            pcm_view.release()
+                            buf_pcm8k.seek(0)
+                            buf_pcm8k.truncate()
+                            ring_filled = min(ring_filled + n, max_samples)
+                            samples_in += n
+                            
+                            # Nothing tentative or in flight and nothing new to hear: skip Whisper and keep
+                            # only this tick's audio so a following word onset isn't cut off
+                            if silent and not prev_words and transcribe_task is None:
+                                ring_filled = min(ring_filled, n)
+                                continue
+                            
+                            # Start the next decode on a snapshot; if one is still running, skip this tick
+                            if transcribe_task is None:
+                                buffer_t0 = (samples_in - ring_filled) / RATE_OUT
+                                snapshot = ring_snapshot(ring, ring_w, ring_filled, snaps[snap_idx])
+                                snap_idx ^= 1
+                                transcribe_task = asyncio.create_task(
+                                    asyncio.to_thread(decode_hypotheses, pipe, snapshot, buffer_t0, confirmed_text)
+                                )
                     
                     except asyncio.TimeoutError:
                         # No audio packet received, continue
@@ -260,26 +605,30 @@ async def main():
             print("Stopping recording...")
             await frame.send_message(0x30, TxCode(value=0).pack())
             
+            # Let an in-flight partial finish; the final decode covers the same audio
+            if transcribe_task is not None:
+                await transcribe_task
+                transcribe_task = None
+            
             # Final transcription
-            if buf_pcm16k.size > 0:
+            if ring_filled > 0:
                 print("Processing final transcription...")
-                await frame.send_message(0x31, "Processing final transcription...".encode())
+                shown, text_seq = await send_text(frame, "Processing final transcription...", "", text_seq)
                 
-                segments, _ = model.transcribe(
-                    buf_pcm16k,
-                    language="en",
-                    beam_size=5,
-                    vad_filter=True,
-                    word_timestamps=False,
+                buffer_t0 = (samples_in - ring_filled) / RATE_OUT
+                snapshot = ring_snapshot(ring, ring_w, ring_filled, snaps[snap_idx])
+                words = await asyncio.to_thread(
+                    run_transcribe, pipe, snapshot, buffer_t0, confirmed_text, final=True
                 )
                 
-                # Collect final transcription
-                final_text = "".join(s.text for s in segments).strip()
+                # Collect final transcription: everything confirmed plus the decoded remainder
+                tail_words = [w for w in words if w[0] >= confirmed_t - 0.1]
+                final_text = (confirmed_text + "".join(w[2] for w in tail_words)).strip()
                 if final_text:
                     print(f"Final transcription: {final_text}")
-                    await frame.send_message(0x31, final_text.encode())
+                    shown, text_seq = await send_text(frame, display_tail(final_text), shown, text_seq)
                 else:
-                    await frame.send_message(0x31, "No speech detected.".encode())
+                    shown, text_seq = await send_text(frame, "No speech detected.", "", text_seq)
             
             print("Ready for next recording.")
             
@@ -291,6 +640,8 @@ async def main():
         traceback.print_exc()
     finally:
         # Clean up resources
+        if pump_task:
+            pump_task.cancel()
         if rx_audio and frame:
             rx_audio.detach(frame)
         if frame:
@@ -299,6 +650,20 @@ async def main():
             await frame.disconnect()
             print("Disconnected from Frame")
 
+async def pump_audio(src: asyncio.Queue, dst: asyncio.Queue):
+    """Forward audio packets into the bounded dst queue, dropping the oldest when it is full"""
+    dropped = 0
+    last_warn = 0.0
+    while True:
+        pkt = await src.get()
+        if dst.full():
+            dst.get_nowait()
+            dropped += 1
+            if time.time() - last_warn >= 5.0:
+                last_warn = time.time()
+                print(f"Warning: falling behind realtime ({dropped} audio packets dropped) - try a smaller MODEL_SIZE")
+        dst.put_nowait(pkt)
+
 async def wait_for_stop(stop_event):
     """Wait for user input to stop recording"""
     await asyncio.to_thread(input, "")